@@ -1,14 +1,18 @@
 # api/main.py
 from __future__ import annotations
 from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
+from dataclasses import dataclass
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import joblib, json, os, datetime as dt
+import joblib, orjson, os, copy, asyncio, bisect, tempfile, time, threading, datetime as dt
+from operator import itemgetter
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 # =========================
@@ -16,7 +20,7 @@ from zoneinfo import ZoneInfo
 # =========================
 LOCAL_TZ = ZoneInfo("Asia/Kolkata")
 def _today_local_str() -> str:
-    return dt.datetime.now(tz=LOCAL_TZ).date().strftime("%Y-%m-%d")
+    return dt.datetime.now(LOCAL_TZ).date().isoformat()
 
 # =========================
 # Robust .env loading
@@ -38,14 +42,21 @@ print("Loaded .env from:", _ENV_PATH)
 # =========================
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except Exception:
     requests = None
 
+# One keep-alive session for the weather provider (no TCP/TLS handshake per call)
+_OW_SESSION = None
+if requests is not None:
+    _OW_SESSION = requests.Session()
+    _OW_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 # =========================
 # Services (your ML modules)
 # =========================
-from .services.demand import predict_one_item, list_available_items
-from .services.syndromes import list_available_syndromes, predict_one_syn
+from .services.demand import predict_items, list_available_items, warm_item_artifacts
+from .services.syndromes import list_available_syndromes, predict_all as predict_all_syns, warm_syn_artifacts
 
 # =========================
 # Paths & artifacts
@@ -70,67 +81,199 @@ if not DATA_CSV.exists():
 # Load model artifacts
 # =========================
 vol_model = joblib.load(VOL_MODEL_PATH)
-vol_intervals = json.load(open(VOL_INTV_PATH))
-vol_feat_list = json.load(open(VOL_FEATS_PATH)).get("features", []) if VOL_FEATS_PATH.exists() else None
+vol_intervals = orjson.loads(VOL_INTV_PATH.read_bytes())
+vol_feat_list = orjson.loads(VOL_FEATS_PATH.read_bytes()).get("features", []) if VOL_FEATS_PATH.exists() else None
+
+# Non-numeric columns were label-encoded at training time with pandas cat.codes,
+# i.e. in sorted label order. Fixed here so single rows encode the same way.
+_WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+VOL_CATEGORY_CODES = {"day_of_week": {d: float(i) for i, d in enumerate(sorted(_WEEKDAYS))}}
 
 # =========================
 # History & weather merging
 # =========================
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    """(mtime_ns, size) of a file, used as cache key; None if the file is missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+_PARQUET_STAMP_KEY = b"smartcare.csv_stamp"
+# Sync endpoints run on a threadpool; one thread at a time checks/rebuilds/reads the cache.
+_PARQUET_LOCK = threading.Lock()
+
+def _refresh_parquet(csv_path: Path, parquet_path: Path, stamp: tuple[int, int] | None) -> bool:
+    """
+    (Re)write parquet_path from csv_path unless it was built from the CSV with this
+    (mtime_ns, size) stamp, recorded in the parquet schema metadata. Comparing stamps
+    (not "parquet newer than CSV") also catches a CSV replaced by an older-dated file.
+    False if the parquet cache is unavailable.
+    """
+    if stamp is None:
+        return False
+    tag = f"{stamp[0]}:{stamp[1]}".encode()
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if parquet_path.exists() and (pq.read_schema(parquet_path).metadata or {}).get(_PARQUET_STAMP_KEY) == tag:
+            return True
+        table = pa.Table.from_pandas(pd.read_csv(csv_path, parse_dates=["date"]), preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _PARQUET_STAMP_KEY: tag})
+        # unique temp file per writer; os.replace is atomic, so readers in other
+        # processes see either the old or the new file, never a partial one
+        fd, tmp = tempfile.mkstemp(prefix=f".{parquet_path.name}.", suffix=".tmp", dir=parquet_path.parent)
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp, compression="zstd")
+            os.replace(tmp, parquet_path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+    except Exception as e:  # pyarrow missing, read-only dir, ...
+        print("Parquet cache unavailable, reading CSV:", e)
+        return False
+
+@lru_cache(maxsize=4)
+def _read_hist(path: str, stamp: tuple[int, int] | None) -> pd.DataFrame:
+    # The CSV stays the source of truth; a typed parquet copy next to it is far cheaper to load.
+    csv_path = Path(path)
+    parquet_path = csv_path.with_suffix(".parquet")
+    df = None
+    with _PARQUET_LOCK:
+        if _refresh_parquet(csv_path, parquet_path, stamp):
+            try:
+                df = pd.read_parquet(parquet_path, engine="pyarrow")
+            except Exception as e:  # unreadable/foreign file: degrade to the CSV
+                print("Parquet cache unreadable, reading CSV:", e)
+    if df is None:
+        df = pd.read_csv(csv_path, parse_dates=["date"])
+    return df.sort_values("date").reset_index(drop=True)
+
 def _load_hist() -> pd.DataFrame:
-    df = pd.read_csv(DATA_CSV, parse_dates=["date"]).sort_values("date").reset_index(drop=True)
-    return df
+    """Parsed history CSV, re-read only when the file changes. Shared: do not mutate."""
+    return _read_hist(str(DATA_CSV), _file_stamp(DATA_CSV))
+
+@lru_cache(maxsize=16)
+def _read_json(path: str, stamp: tuple[int, int]) -> dict:
+    try:
+        return orjson.loads(Path(path).read_bytes())
+    except Exception:
+        return {}
 
 def _safe_load_json(path: Path) -> dict:
-    if path.exists():
-        try:
-            return json.load(open(path, "r", encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+    """Cached by file mtime/size. Shared: deepcopy before mutating."""
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return {}
+    return _read_json(str(path), stamp)
 
 def _safe_save_json(path: Path, data: dict):
     path.parent.mkdir(parents=True, exist_ok=True)
-    json.dump(data, open(path, "w", encoding="utf-8"), indent=2)
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
 def _load_weather_overrides() -> dict:
     return _safe_load_json(WEATHER_OVERRIDES_JSON)
 
 def _save_weather_override(date_str: str, temperature: float | None, rainfall: float | None, humidity: float | None):
-    data = _load_weather_overrides()
+    data = copy.deepcopy(_load_weather_overrides())
     data[date_str] = {"temperature": temperature, "rainfall": rainfall, "humidity": humidity}
     _safe_save_json(WEATHER_OVERRIDES_JSON, data)
 
-def _apply_weather_overrides(df: pd.DataFrame) -> pd.DataFrame:
-    """Merge overrides by date (YYYY-MM-DD). Overrides win over CSV values."""
+WEATHER_COLS = ["temperature", "rainfall", "humidity"]
+
+@lru_cache(maxsize=2)
+def _overrides_frame(stamp: tuple[int, int] | None) -> pd.DataFrame:
+    """Weather overrides indexed by normalized date; rebuilt only when the file changes."""
     overrides = _load_weather_overrides()
     if not overrides:
+        return pd.DataFrame(columns=WEATHER_COLS, dtype=float)
+    ov = pd.DataFrame(
+        [[v.get(c) for c in WEATHER_COLS] for v in overrides.values()],
+        index=pd.to_datetime(list(overrides.keys())).normalize(),
+        columns=WEATHER_COLS,
+        dtype=float,
+    )
+    return ov[~ov.index.duplicated(keep="last")]
+
+def _apply_weather_overrides(df: pd.DataFrame) -> pd.DataFrame:
+    """Overlay overrides by date (YYYY-MM-DD). Non-null override values win over CSV values."""
+    ov = _overrides_frame(_file_stamp(WEATHER_OVERRIDES_JSON))
+    if ov.empty:
         return df
-    dfo = pd.DataFrame([
-        {"date": pd.to_datetime(k).normalize(),
-         "temperature": v.get("temperature"),
-         "rainfall": v.get("rainfall"),
-         "humidity": v.get("humidity")}
-        for k, v in overrides.items()
-    ])
-    dfo = dfo.sort_values("date")
-    dfm = df.copy()
+    dfm = df.copy(deep=False)  # only whole columns are replaced below
     dfm["date"] = pd.to_datetime(dfm["date"]).dt.normalize()
-    dfm = dfm.merge(dfo, on="date", how="left", suffixes=("", "_ovr"))
-    for col in ["temperature", "rainfall", "humidity"]:
-        ocol = f"{col}_ovr"
-        if ocol in dfm.columns:
-            dfm[col] = np.where(dfm[ocol].notna(), dfm[ocol], dfm[col])
-            dfm.drop(columns=[ocol], inplace=True)
-    return dfm.sort_values("date").reset_index(drop=True)
+    hit = dfm["date"].isin(ov.index).to_numpy()
+    if not hit.any():
+        return dfm
+    rows = np.flatnonzero(hit)
+    ov_hit = ov.loc[dfm["date"].to_numpy()[rows]]
+    for col in WEATHER_COLS:
+        if col not in dfm.columns:
+            continue
+        vals = ov_hit[col].to_numpy()
+        keep = ~np.isnan(vals)
+        if not keep.any():
+            continue
+        merged = dfm[col].to_numpy(dtype=float, copy=True)
+        merged[rows[keep]] = vals[keep]
+        dfm[col] = merged
+    return dfm
+
+def _hist_key() -> tuple:
+    """Identifies the current data state: history CSV + weather overrides stamps."""
+    return (_file_stamp(DATA_CSV), _file_stamp(WEATHER_OVERRIDES_JSON))
+
+@lru_cache(maxsize=2)
+def _merged_hist(hist_key: tuple) -> pd.DataFrame:
+    return _apply_weather_overrides(_load_hist())
 
 _hist_base = _load_hist()
 def _hist_with_weather() -> pd.DataFrame:
-    return _apply_weather_overrides(_load_hist())  # re-read so weather edits reflect immediately
+    return _merged_hist(_hist_key())  # keyed on mtimes, so weather edits reflect immediately
+
+@dataclass(frozen=True)
+class HistCache:
+    """Struct-of-arrays view of the merged history for hot paths that need no DataFrame."""
+    dates: np.ndarray                 # datetime64[D]
+    patients: np.ndarray              # float64 total_patients
+    temperature: np.ndarray | None    # float64, NaN where missing; None if no such column
+    rainfall: np.ndarray | None
+    humidity: np.ndarray | None
+
+    def last_weather(self, col: str) -> float | None:
+        arr = getattr(self, col)
+        return None if arr is None else float(arr[-1])
+
+def _to_hist_arrays(df: pd.DataFrame) -> HistCache:
+    def num(col: str) -> np.ndarray | None:
+        if col not in df.columns:
+            return None
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+    return HistCache(
+        dates=df["date"].to_numpy().astype("datetime64[D]"),
+        patients=num("total_patients"),
+        temperature=num("temperature"),
+        rainfall=num("rainfall"),
+        humidity=num("humidity"),
+    )
+
+@lru_cache(maxsize=2)
+def _hist_arrays(hist_key: tuple) -> HistCache:
+    return _to_hist_arrays(_merged_hist(hist_key))
 
 # =========================
 # Feature builders
 # =========================
+# Leading rows of a feature frame that cannot have a complete lag_28/roll_*_28.
+MAX_WARMUP = 28
+LAG_ROLL_COLS = ["lag_1", "lag_7", "lag_14", "lag_28",
+                 "roll_mean_7", "roll_std_7", "roll_mean_14", "roll_std_14", "roll_mean_28", "roll_std_28"]
+
 def build_volume_features(df: pd.DataFrame) -> pd.DataFrame:
+    # full history on purpose, see tests/test_ml.py
     d = df.sort_values("date").copy()
     d["total_patients"] = pd.to_numeric(d["total_patients"], errors="coerce")
     # lags
@@ -153,11 +296,12 @@ def build_volume_features(df: pd.DataFrame) -> pd.DataFrame:
 def prep_X_from_features(feat_df: pd.DataFrame, training_features: Optional[List[str]] = None) -> pd.DataFrame:
     X = feat_df.copy()
     X = X.drop(columns=[c for c in ["date", "total_patients"] if c in X.columns], errors="ignore")
-    # drop constant cols
-    nunique = X.nunique(dropna=False)
-    const_cols = nunique[nunique <= 1].index.tolist()
-    if const_cols:
-        X = X.drop(columns=const_cols)
+    # drop constant cols (only when discovering features; aligned columns would come back as 0)
+    if not training_features:
+        nunique = X.nunique(dropna=False)
+        const_cols = nunique[nunique <= 1].index.tolist()
+        if const_cols:
+            X = X.drop(columns=const_cols)
     # encode non-numeric
     for c in X.select_dtypes(include=["object", "category"]).columns:
         X[c] = X[c].astype("category").cat.codes
@@ -170,6 +314,23 @@ def prep_X_from_features(feat_df: pd.DataFrame, training_features: Optional[List
         X = X[training_features]
     return X
 
+def _row_to_X(feat_row: pd.Series, training_features: List[str]) -> np.ndarray:
+    """
+    Single feature row -> (1, F) float64 matrix in training order.
+    Specialized prep_X_from_features for a known feature list: no constant-column
+    or dtype discovery; categories use VOL_CATEGORY_CODES, missing columns are 0.
+    """
+    x = np.zeros((1, len(training_features)), dtype=np.float64)
+    for i, col in enumerate(training_features):
+        v = feat_row.get(col)
+        if col in VOL_CATEGORY_CODES:
+            v = VOL_CATEGORY_CODES[col].get(v, -1.0)
+        try:
+            x[0, i] = float(v)
+        except (TypeError, ValueError):
+            x[0, i] = np.nan
+    return np.nan_to_num(x, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
 # =========================
 # Pydantic models
 # =========================
@@ -232,7 +393,20 @@ class InventoryUpsertReq(BaseModel):
 # =========================
 # FastAPI app + CORS
 # =========================
-app = FastAPI(title="SmartCare API", version="0.3.0")
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Warm models before serving: artifact loads, first-call predict overhead, feature kernel JIT
+    warmed = warm_item_artifacts()
+    print("Warmed demand models:", warmed)
+    print("Warmed syndrome models:", warm_syn_artifacts())
+    vol_model.predict(np.zeros((1, vol_model.n_features_in_)))
+    try:
+        _volume_last_row(_hist_key())
+    except Exception as e:
+        print("Volume warm-up skipped:", e)
+    yield
+
+app = FastAPI(title="SmartCare API", version="0.3.0", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # dev: open; lock down later
@@ -244,18 +418,32 @@ app.add_middleware(
 # =========================
 # Helpers
 # =========================
+def _norm_date(s: str) -> str:
+    """Validate a YYYY-MM-DD string and return it normalized; 400 otherwise."""
+    try:
+        return dt.date.fromisoformat(s).isoformat()
+    except (TypeError, ValueError):
+        raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD.")
+
 def _clean_num(x: float | None) -> float | None:
     if x is None:
         return None
     return round(max(0.0, float(x)), 2)
 
-def compute_status_level(yhat: float) -> str:
-    df = _hist_with_weather()
-    last90 = df.tail(90)["total_patients"].astype(float)
+@lru_cache(maxsize=1)
+def _status_thresholds(hist_key: tuple) -> tuple[float, float] | None:
+    """(p60, p85) of total_patients over the last 90 days; None if under 10 days."""
+    last90 = _hist_arrays(hist_key).patients[-90:]
     if len(last90) < 10:
+        return None
+    p60, p85 = np.percentile(last90, (60, 85))
+    return float(p60), float(p85)
+
+def compute_status_level(yhat: float, hist_key: Optional[tuple] = None) -> str:
+    thr = _status_thresholds(_hist_key() if hist_key is None else hist_key)
+    if thr is None:
         return "GREEN" if yhat < 50 else ("YELLOW" if yhat < 80 else "RED")
-    p60 = np.percentile(last90, 60)
-    p85 = np.percentile(last90, 85)
+    p60, p85 = thr
     if yhat <= p60: return "GREEN"
     if yhat <= p85: return "YELLOW"
     return "RED"
@@ -292,17 +480,34 @@ def root():
 # =========================
 # Predictions
 # =========================
-@app.post("/predict/volume", response_model=VolumeRes)
-def predict_volume(req: VolumeReq):
-    df = _hist_with_weather()
-    feats = build_volume_features(df)
-    need = [c for c in feats.columns if c.startswith("lag_") or c.startswith("roll_")]
-    feats = feats.dropna(subset=need)
+def _volume_row(df: pd.DataFrame) -> np.ndarray | pd.DataFrame | None:
+    """Feature row for the latest date in df, ready for vol_model.predict."""
+    # Warm-up rows are sliced off by position; only the rest is checked for gaps.
+    feats = build_volume_features(df).iloc[MAX_WARMUP:]
+    if feats[LAG_ROLL_COLS].isna().any(axis=None):
+        feats = feats.dropna(subset=LAG_ROLL_COLS)
     if feats.empty:
+        return None
+    if vol_feat_list:
+        return _row_to_X(feats.iloc[-1], vol_feat_list)
+    return prep_X_from_features(feats).iloc[[-1]]
+
+@lru_cache(maxsize=2)
+def _volume_last_row(hist_key: tuple) -> np.ndarray | pd.DataFrame | None:
+    """_volume_row memoized per data state."""
+    return _volume_row(_merged_hist(hist_key))
+
+def _check_hist(df: pd.DataFrame):
+    if "date" not in df or not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        raise HTTPException(500, "History 'date' column invalid or missing.")
+
+# The *_impl functions take an optional data-state key so aggregators such as
+# /mobile/today can pin one history snapshot for every section; features are
+# built over full history once per data state and memoized on that key.
+def predict_volume_impl(hist_key: Optional[tuple] = None, today: Optional[str] = None) -> dict:
+    x = _volume_last_row(_hist_key() if hist_key is None else hist_key)
+    if x is None:
         raise HTTPException(400, "Not enough history to form features (lags/rollings).")
-    X_all = prep_X_from_features(feats, vol_feat_list)
-    x = X_all.iloc[[-1]]
-    pred_date = str(feats.iloc[-1]["date"].date())
 
     yhat = float(vol_model.predict(x)[0])
 
@@ -311,10 +516,7 @@ def predict_volume(req: VolumeReq):
     p10 = yhat + p10_res
     p90 = yhat + p90_res
 
-       # get the date for which prediction was made
-    
-
-    pred_date = _today_local_str()  # 👈 always use clinic's today in IST
+    pred_date = today or _today_local_str()  # 👈 always use clinic's today in IST
 
     return {
     "predicted_visits": _clean_num(yhat),
@@ -324,60 +526,74 @@ def predict_volume(req: VolumeReq):
     "for_date": pred_date
 }
 
+@app.post("/predict/volume", response_model=VolumeRes)
+def predict_volume(req: VolumeReq):
+    return predict_volume_impl()
 
-@app.post("/predict/demand", response_model=List[DemandResItem])
-def predict_demand(req: DemandReq):
-    items = req.items or list_available_items()
+
+@lru_cache(maxsize=8)
+def _demand_predictions(hist_key: tuple, items: tuple) -> List[dict]:
+    """predict_items memoized per data state and item set."""
+    return predict_items(_merged_hist(hist_key), list(items))
+
+def predict_demand_impl(items: Optional[List[str]] = None, hist_key: Optional[tuple] = None) -> List[DemandResItem]:
+    items = items or list_available_items()
     if not items:
         raise HTTPException(404, "No demand artifacts found under ml/artifacts/demand/.")
-    df = _hist_with_weather()
-    if "date" not in df or not pd.api.types.is_datetime64_any_dtype(df["date"]):
-        raise HTTPException(500, "History 'date' column invalid or missing.")
-    out: List[DemandResItem] = []
-    for item in items:
-        try:
-            pred = predict_one_item(df, item)
-            out.append(DemandResItem(
-                item_code = pred["item_code"],
-                yhat = _clean_num(pred["yhat"]),
-                p10  = _clean_num(pred["p10"]),
-                p90  = _clean_num(pred["p90"]),
-            ))
-        except FileNotFoundError:
-            continue
-        except Exception as e:
-            raise HTTPException(500, f"Error predicting item '{item}': {e}")
+    if hist_key is None:
+        hist_key = _hist_key()
+    _check_hist(_merged_hist(hist_key))
+    try:
+        preds = _demand_predictions(hist_key, tuple(items))
+    except Exception as e:
+        raise HTTPException(500, str(e))
+    out: List[DemandResItem] = [
+        DemandResItem(
+            item_code = pred["item_code"],
+            yhat = _clean_num(pred["yhat"]),
+            p10  = _clean_num(pred["p10"]),
+            p90  = _clean_num(pred["p90"]),
+        ) for pred in preds
+    ]
     if not out:
         raise HTTPException(404, "No demand predictions produced.")
     return out
 
-@app.post("/predict/syndromes", response_model=List[SyndromeResItem])
-def predict_syndromes(req: SyndromesReq):
-    df = _hist_with_weather()
-    if "date" not in df or not pd.api.types.is_datetime64_any_dtype(df["date"]):
-        raise HTTPException(500, "History 'date' column invalid or missing.")
-    syns = req.syndromes or list_available_syndromes()
+@app.post("/predict/demand", response_model=List[DemandResItem])
+async def predict_demand(req: DemandReq):
+    # per-item model.predict calls fan out on the demand service's thread pool
+    return await asyncio.to_thread(predict_demand_impl, req.items)
+
+@lru_cache(maxsize=8)
+def _syndrome_predictions(hist_key: tuple, syns: tuple) -> List[dict]:
+    """predict_all_syns memoized per data state and syndrome set."""
+    return predict_all_syns(_merged_hist(hist_key), list(syns))
+
+def predict_syndromes_impl(top_n: int = 3, syndromes: Optional[List[str]] = None, hist_key: Optional[tuple] = None) -> List[SyndromeResItem]:
+    if hist_key is None:
+        hist_key = _hist_key()
+    _check_hist(_merged_hist(hist_key))
+    syns = syndromes or list_available_syndromes()
     if not syns:
         raise HTTPException(404, "No syndrome artifacts found.")
-    out = []
-    for s in syns:
-        try:
-            out.append(predict_one_syn(df, s))
-        except Exception:
-            continue
+    out = _syndrome_predictions(hist_key, tuple(syns))
     if not out:
         raise HTTPException(404, "No syndrome predictions produced.")
-    out = sorted(out, key=lambda x: x["prob"], reverse=True)[: max(1, req.top_n)]
+    out = sorted(out, key=lambda x: x["prob"], reverse=True)[: max(1, top_n)]
     return [SyndromeResItem(syndrome=o["syndrome"], prob=round(float(o["prob"]), 3), rank=i+1) for i, o in enumerate(out)]
 
+@app.post("/predict/syndromes", response_model=List[SyndromeResItem])
+def predict_syndromes(req: SyndromesReq):
+    return predict_syndromes_impl(req.top_n, req.syndromes)
+
 # =========================
 # Nurse log (IST calendar)
 # =========================
 def _load_nurse_log() -> dict:
     return _safe_load_json(NURSE_LOG_JSON)
 
-def _save_nurse_log_entry(date_str: str, payload: dict, merge: bool = True):
-    data = _load_nurse_log()
+def _save_nurse_log_entry(date_str: str, payload: dict, merge: bool = True) -> dict:
+    data = copy.deepcopy(_load_nurse_log())
     existing = data.get(date_str, {}) if merge else {}
 
     # 🔹 Always ensure all symptom fields exist
@@ -401,28 +617,23 @@ def _save_nurse_log_entry(date_str: str, payload: dict, merge: bool = True):
     existing["date"] = date_str
     data[date_str] = existing
     _safe_save_json(NURSE_LOG_JSON, data)
+    return existing
 
 @app.post("/nurse/log")
 def nurse_log(req: NurseLogReq):
     # normalize to IST calendar day (if no date supplied)
     if req.date:
-        try:
-            date_norm = pd.to_datetime(req.date).date().strftime("%Y-%m-%d")
-        except Exception:
-            raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD.")
+        date_norm = _norm_date(req.date)
     else:
         date_norm = _today_local_str()
     payload = req.dict()
     payload.pop("date", None)
-    _save_nurse_log_entry(date_norm, payload, merge=True)
-    return {"ok": True, "saved": _load_nurse_log().get(date_norm, {})}
+    saved = _save_nurse_log_entry(date_norm, payload, merge=True)
+    return {"ok": True, "saved": saved}
 
 @app.get("/nurse/log/{date}")
 def nurse_log_get(date: str):
-    try:
-        date_norm = pd.to_datetime(date).date().strftime("%Y-%m-%d")
-    except Exception:
-        raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD.")
+    date_norm = _norm_date(date)
     return {"date": date_norm, "log": _load_nurse_log().get(date_norm, {})}
 
 @app.get("/debug/nurse-log")
@@ -450,7 +661,7 @@ def get_inventory():
 
 @app.post("/inventory/upsert")
 def upsert_inventory(req: InventoryUpsertReq):
-    inv = _load_inventory()
+    inv = copy.deepcopy(_load_inventory())
     row = inv.get(req.item_code, {"name": req.item_code, "on_hand": 0, "reorder_point": 0})
     if req.name is not None: row["name"] = req.name
     if req.on_hand is not None: row["on_hand"] = int(req.on_hand)
@@ -462,6 +673,20 @@ def upsert_inventory(req: InventoryUpsertReq):
 # =========================
 # Mobile aggregator
 # =========================
+SEVERITY_RANK = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+_STOCK_RATIO_CUTS = (0.25, 0.5)           # on_hand / reorder_point
+_STOCK_LEVELS = ("HIGH", "MEDIUM", "LOW")
+
+def _stock_severity(on_hand: float, reorder_point: float) -> str | None:
+    """HIGH below 25% of the reorder point, MEDIUM below 50%, LOW up to 100%."""
+    if reorder_point > 0:
+        r = on_hand / reorder_point
+        return None if r > 1 else _STOCK_LEVELS[bisect.bisect_right(_STOCK_RATIO_CUTS, r)]
+    # no usable ratio; with reorder_point <= 0 the MEDIUM band is empty
+    if on_hand < reorder_point * 0.25:
+        return "HIGH"
+    return "LOW" if on_hand <= reorder_point else None
+
 def compute_critical_alerts(demand_preds: List[DemandResItem], inv: dict) -> List[dict]:
     alerts = []
 
@@ -475,20 +700,14 @@ def compute_critical_alerts(demand_preds: List[DemandResItem], inv: dict) -> Lis
         weekly_high = high_today * 7.0
 
         # 🔹 Stock vs reorder threshold checks
-        severity = None
-        if inv_row["on_hand"] < inv_row["reorder_point"] * 0.25:
-            severity = "HIGH"
-        elif inv_row["on_hand"] < inv_row["reorder_point"] * 0.5:
-            severity = "MEDIUM"
-        elif inv_row["on_hand"] <= inv_row["reorder_point"]:
-            severity = "LOW"
-
+        severity = _stock_severity(inv_row["on_hand"], inv_row["reorder_point"])
         if severity:
             alerts.append({
                 "type": "stockout_risk",
                 "severity": severity,
                 "message": f"{inv_row['name']}: only {inv_row['on_hand']} left (reorder level {inv_row['reorder_point']})",
-                "item_code": d.item_code
+                "item_code": d.item_code,
+                "_sev": SEVERITY_RANK[severity],
             })
 
         # 🔹 Demand forecast checks
@@ -497,49 +716,41 @@ def compute_critical_alerts(demand_preds: List[DemandResItem], inv: dict) -> Lis
                 "type": "stockout_risk",
                 "severity": "HIGH",
                 "message": f"{inv_row['name']}: need {weekly_high:.0f}, only {inv_row['on_hand']} in stock",
-                "item_code": d.item_code
+                "item_code": d.item_code,
+                "_sev": SEVERITY_RANK["HIGH"],
             })
         elif weekly_high > inv_row["reorder_point"]:
             alerts.append({
                 "type": "reorder",
                 "severity": "MEDIUM",
                 "message": f"{inv_row['name']}: need {weekly_high:.0f}, reorder level {inv_row['reorder_point']}",
-                "item_code": d.item_code
+                "item_code": d.item_code,
+                "_sev": SEVERITY_RANK["MEDIUM"],
             })
 
     # 🔹 Sort: HIGH first, then MEDIUM, then LOW
-    alerts.sort(key=lambda a: 0 if a["severity"] == "HIGH" else (1 if a["severity"] == "MEDIUM" else 2))
+    alerts.sort(key=itemgetter("_sev"))
+    for a in alerts:
+        del a["_sev"]  # internal sort key only
     return alerts
 
-@app.get("/mobile/today")
-def mobile_today():
-    # volume
-    vol = predict_volume(VolumeReq())
-
-    # demand
-    items = list_available_items()
-    demand_list = predict_demand(DemandReq(items=items))
-
+def _mobile_sections(hist_key: tuple, hc: HistCache, vol: dict, demand_list: List[DemandResItem],
+                     syn_top, today_local: str) -> dict:
+    """Everything /mobile/today needs after the predictions (file-backed, so run off the loop)."""
     # inventory + alerts
     inv = _load_inventory()
     alerts = compute_critical_alerts(demand_list, inv)
     high_alerts = [a for a in alerts if a["severity"] == "HIGH"]
-    # syndromes
-    try:
-        syn_top = predict_syndromes(SyndromesReq(top_n=3))
-        syn_payload = [s.dict() for s in syn_top]
-    except Exception:
-        syn_payload = []
+    # syndromes (optional section)
+    syn_payload = [] if isinstance(syn_top, BaseException) else [s.dict() for s in syn_top]
 
     # nurse log for IST today
     nl = _load_nurse_log()
-    today_local = _today_local_str()
     nurse_today = nl.get(today_local, {})
 
     # delta vs yesterday
-    df = _hist_with_weather()
     try:
-        yday = float(df.iloc[-2]["total_patients"])
+        yday = float(hc.patients[-2])
         delta_pct = round(((vol["predicted_visits"] - yday) / max(1.0, yday)) * 100, 1)
     except Exception:
         delta_pct = 0
@@ -549,7 +760,7 @@ def mobile_today():
         "expected_patients": vol["predicted_visits"],
         "delta_vs_yesterday_pct": delta_pct,
         "status": {
-            "level": compute_status_level(vol["predicted_visits"]),
+            "level": compute_status_level(vol["predicted_visits"], hist_key),
             "reason": "Based on percentile thresholds (last 90 days)"
         },
         "top_syndromes": syn_payload,
@@ -564,6 +775,28 @@ def mobile_today():
         "for_date": vol.get("for_date"),   # 👈 NEW
     }
 
+@app.get("/mobile/today")
+async def mobile_today():
+    # one history snapshot and IST date shared by every section below; the
+    # snapshot is loaded here once so the concurrent sections don't each parse it
+    hist_key = await asyncio.to_thread(_hist_key)
+    hc = await asyncio.to_thread(_hist_arrays, hist_key)
+    today_local = _today_local_str()
+
+    # volume, demand and syndromes are independent; run them concurrently
+    # (most of their time is in numpy/LightGBM code that releases the GIL)
+    vol, demand_list, syn_top = await asyncio.gather(
+        asyncio.to_thread(predict_volume_impl, hist_key, today_local),
+        asyncio.to_thread(predict_demand_impl, None, hist_key),  # all available items
+        asyncio.to_thread(predict_syndromes_impl, 3, None, hist_key),
+        return_exceptions=True,
+    )
+    for res in (vol, demand_list):
+        if isinstance(res, BaseException):
+            raise res
+
+    return await asyncio.to_thread(_mobile_sections, hist_key, hc, vol, demand_list, syn_top, today_local)
+
 
 # =========================
 # Weather endpoints
@@ -571,34 +804,69 @@ def mobile_today():
 # =========================
 @app.get("/alerts")
 def get_all_alerts():
-    items = list_available_items()
-    demand_list = predict_demand(DemandReq(items=items))
+    demand_list = predict_demand_impl(list_available_items())
     inv = _load_inventory()
     alerts = compute_critical_alerts(demand_list, inv)
     return {"alerts": alerts}
 
 @app.post("/weather/upsert")
 def weather_upsert(req: WeatherUpsertReq):
-    try:
-        date_norm = pd.to_datetime(req.date).date().strftime("%Y-%m-%d")
-    except Exception:
-        raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD.")
+    date_norm = _norm_date(req.date)
     _save_weather_override(date_norm, req.temperature, req.rainfall, req.humidity)
     return {"ok": True, "date": date_norm, "applied": {"temperature": req.temperature, "rainfall": req.rainfall, "humidity": req.humidity}}
 
 @app.get("/weather/today")
 def weather_today():
-    df = _hist_with_weather()
-    if df.empty:
+    hc = _hist_arrays(_hist_key())
+    if not len(hc.dates):
         raise HTTPException(404, "No history.")
-    last = df.iloc[-1]
     return {
-        "date": str(last["date"].date()),
-        "temperature": None if "temperature" not in df.columns else _clean_num(last.get("temperature")),
-        "rainfall": None if "rainfall" not in df.columns else _clean_num(last.get("rainfall")),
-        "humidity": None if "humidity" not in df.columns else _clean_num(last.get("humidity")),
+        "date": str(hc.dates[-1]),
+        "temperature": _clean_num(hc.last_weather("temperature")),
+        "rainfall": _clean_num(hc.last_weather("rainfall")),
+        "humidity": _clean_num(hc.last_weather("humidity")),
     }
 
+OW_URL = "https://api.openweathermap.org/data/2.5/weather"
+OW_CACHE_TTL = 600    # seconds
+OW_CACHE_MAX = 256
+_ow_cache: dict = {}  # (lat, lon, units) -> (expires_at, payload)
+_ow_cache_lock = threading.Lock()
+
+def _fetch_openweather(lat: float, lon: float, units: str, api_key: str) -> dict:
+    """
+    Current weather payload from OpenWeather, via the shared session.
+    Successful responses are cached for OW_CACHE_TTL per (lat, lon rounded to 3 dp, units).
+    """
+    key = (round(lat, 3), round(lon, 3), units)
+    now = time.monotonic()
+    with _ow_cache_lock:
+        hit = _ow_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    try:
+        r = _OW_SESSION.get(
+            OW_URL,
+            params={"lat": lat, "lon": lon, "appid": api_key, "units": units},
+            timeout=(3, 7),
+        )
+    except requests.exceptions.RequestException as e:
+        raise HTTPException(502, f"Weather provider network error: {e}")
+
+    if r.status_code == 401:
+        raise HTTPException(502, f"Weather provider auth error (401): {r.text[:200]}")
+    if r.status_code >= 400:
+        raise HTTPException(502, f"Weather provider error {r.status_code}: {r.text[:200]}")
+
+    data = r.json()
+    with _ow_cache_lock:
+        if len(_ow_cache) >= OW_CACHE_MAX:
+            for k in [k for k, (exp, _) in _ow_cache.items() if exp <= now] or [next(iter(_ow_cache))]:
+                del _ow_cache[k]
+        _ow_cache[key] = (now + OW_CACHE_TTL, data)
+    return data
+
 @app.post("/weather/fetch")
 def weather_fetch(req: WeatherFetchReq):
     """
@@ -615,22 +883,7 @@ def weather_fetch(req: WeatherFetchReq):
 
     date_norm = (req.date or _today_local_str())
 
-    url = "https://api.openweathermap.org/data/2.5/weather"
-    try:
-        r = requests.get(
-            url,
-            params={"lat": req.lat, "lon": req.lon, "appid": api_key, "units": req.units},
-            timeout=10,
-        )
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(502, f"Weather provider network error: {e}")
-
-    if r.status_code == 401:
-        raise HTTPException(502, f"Weather provider auth error (401): {r.text[:200]}")
-    if r.status_code >= 400:
-        raise HTTPException(502, f"Weather provider error {r.status_code}: {r.text[:200]}")
-
-    data = r.json()
+    data = _fetch_openweather(req.lat, req.lon, req.units, api_key)
     main = data.get("main", {}) if isinstance(data, dict) else {}
     temp = main.get("temp")
     humid = main.get("humidity")
@@ -648,12 +901,10 @@ def weather_fetch(req: WeatherFetchReq):
 # =========================
 @app.get("/debug/status-thresholds")
 def debug_status_thresholds():
-    df = _hist_with_weather()
-    last90 = df.tail(90)["total_patients"].astype(float)
-    if len(last90) < 10:
+    thr = _status_thresholds(_hist_key())
+    if thr is None:
         return {"mode": "fallback", "green_lt": 50, "yellow_lt": 80}
-    p60 = float(np.percentile(last90, 60))
-    p85 = float(np.percentile(last90, 85))
+    p60, p85 = thr
     return {"mode": "percentile", "p60_green_max": round(p60, 2), "p85_yellow_max": round(p85, 2)}
 
 @app.get("/debug/env")
@@ -1,11 +1,16 @@
 from pathlib import Path
 from typing import List, Dict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-import joblib, json
+import joblib, orjson, os
 
 ART_ROOT = Path("ml/artifacts/demand")
 
+# Shared across requests; model.predict runs in native code and releases the GIL.
+_PREDICT_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="demand")
+
 def list_available_items() -> List[str]:
     """Return item_code folder names found under ml/artifacts/demand/"""
     if not ART_ROOT.exists():
@@ -17,6 +22,7 @@ def _build_features_for_item(hist_df: pd.DataFrame, item_col: str) -> pd.DataFra
     Build the same kind of features you trained in Colab for a single demand series.
     hist_df must have a datetime 'date' column and optional weather columns.
     item_col is the CSV column name like 'paracetamol_used'.
+    Full history on purpose, see tests/test_ml.py.
     """
     if item_col not in hist_df.columns:
         raise FileNotFoundError(f"Column '{item_col}' not found in history CSV.")
@@ -31,7 +37,7 @@ def _build_features_for_item(hist_df: pd.DataFrame, item_col: str) -> pd.DataFra
         d[f"roll_std_{w}"]  = d["y"].rolling(w).std()
 
     # Calendar + optional weather copied from hist_df
-    d["date"] = hist_df["date"].values
+    d["date"] = hist_df["date"]
     d["dow"] = d["date"].dt.dayofweek
     d["month"] = d["date"].dt.month
     for col in ["temperature", "rainfall", "humidity"]:
@@ -46,10 +52,12 @@ def _build_features_for_item(hist_df: pd.DataFrame, item_col: str) -> pd.DataFra
     X = d.drop(columns=["y", "date"], errors="ignore").replace([np.inf, -np.inf], np.nan).fillna(0)
     return X
 
+@lru_cache(maxsize=None)
 def _load_item_artifacts(item_code: str):
     """
     Load artifacts for an item_code folder:
     ml/artifacts/demand/<item_code>/{model.pkl, features.json, intervals.json}
+    Cached per process; the returned model is shared and must be treated read-only.
     """
     base = ART_ROOT / item_code
     model_path = base / "model.pkl"
@@ -64,10 +72,43 @@ def _load_item_artifacts(item_code: str):
         raise FileNotFoundError(f"intervals.json not found for item '{item_code}'")
 
     model = joblib.load(model_path)
-    features = json.load(open(feats_path)).get("features", [])
-    intervals = json.load(open(intr_path))
+    features = orjson.loads(feats_path.read_bytes()).get("features", [])
+    intervals = orjson.loads(intr_path.read_bytes())
     return model, features, intervals
 
+def warm_item_artifacts() -> List[str]:
+    """
+    Load every available item's artifacts (into the per-process cache) and run one
+    dummy predict per model, so the first real request pays no disk I/O or
+    first-call overhead. Returns the item codes that were warmed.
+    """
+    warmed = []
+    for code in list_available_items():
+        try:
+            model, _, _ = _load_item_artifacts(code)
+            model.predict(np.zeros((1, model.n_features_in_)))
+        except Exception as e:
+            print(f"Demand warm-up skipped for '{code}': {e}")
+            continue
+        warmed.append(code)
+    return warmed
+
+def _last_feature_row(hist_df: pd.DataFrame, item_code: str, feat_list: List[str]) -> np.ndarray:
+    """
+    Feature row for the latest date as a (1, F) float64 array in training order.
+    Models get a plain ndarray, skipping DataFrame conversion/column handling in predict.
+    """
+    csv_col = f"{item_code}_used"
+    X_all = _build_features_for_item(hist_df, csv_col)
+    if X_all.empty:
+        raise ValueError(f"Not enough history to predict for '{item_code}'.")
+    return X_all.iloc[[-1]].reindex(columns=feat_list, fill_value=0).to_numpy(dtype=np.float64)
+
+def _with_intervals(item_code: str, yhat: float, intervals: dict) -> Dict:
+    p10 = yhat + float(intervals.get("residual_p10", -1.0))
+    p90 = yhat + float(intervals.get("residual_p90",  1.0))
+    return {"item_code": item_code, "yhat": yhat, "p10": p10, "p90": p90}
+
 def predict_one_item(hist_df: pd.DataFrame, item_code: str) -> Dict:
     """
     Predict demand for a single item_code.
@@ -75,26 +116,40 @@ def predict_one_item(hist_df: pd.DataFrame, item_code: str) -> Dict:
     - item_code: folder name under artifacts (e.g., 'paracetamol', 'ors_packets').
     Returns dict {item_code, yhat, p10, p90}.
     """
-    # Build features from history
-    csv_col = f"{item_code}_used"
-    X_all = _build_features_for_item(hist_df, csv_col)
-
-    # Load artifacts and align feature columns in the same order as training
     model, feat_list, intervals = _load_item_artifacts(item_code)
-
-    # Add any missing columns as 0, then reorder
-    for col in feat_list:
-        if col not in X_all.columns:
-            X_all[col] = 0
-    X_all = X_all[feat_list]
-
-    if X_all.empty:
-        raise ValueError(f"Not enough history to predict for '{item_code}'.")
-
-    x = X_all.iloc[[-1]]
+    x = _last_feature_row(hist_df, item_code, feat_list)
     yhat = float(model.predict(x)[0])
+    return _with_intervals(item_code, yhat, intervals)
 
-    p10 = yhat + float(intervals.get("residual_p10", -1.0))
-    p90 = yhat + float(intervals.get("residual_p90",  1.0))
+def predict_items(hist_df: pd.DataFrame, item_codes: List[str]) -> List[Dict]:
+    """
+    Predict demand for several items: each item's last-row features are built,
+    then every model predicts its own row on the shared thread pool.
+    Items without artifacts or a history column are skipped; any other
+    failure is raised as RuntimeError naming the item.
+    Returns [{item_code, yhat, p10, p90}, ...] in input order.
+    """
+    codes, arts, rows = [], [], []
+    for code in item_codes:
+        try:
+            art = _load_item_artifacts(code)
+            row = _last_feature_row(hist_df, code, art[1])
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            raise RuntimeError(f"Error predicting item '{code}': {e}") from e
+        codes.append(code)
+        arts.append(art)
+        rows.append(row)
+    if not codes:
+        return []
 
-    return {"item_code": item_code, "yhat": yhat, "p10": p10, "p90": p90}
+    def _predict(i: int) -> float:
+        model = arts[i][0]
+        try:
+            return float(model.predict(rows[i])[0])
+        except Exception as e:
+            raise RuntimeError(f"Error predicting item '{codes[i]}': {e}") from e
+
+    yhats = list(_PREDICT_POOL.map(_predict, range(len(codes))))
+    return [_with_intervals(code, yhat, art[2]) for code, yhat, art in zip(codes, yhats, arts)]
@@ -1,61 +1,145 @@
 # smartcare/api/services/syndromes.py
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-import joblib, json
+import joblib, orjson, os, time
 
 ART_ROOT = Path("ml/artifacts/syndromes")
+WEATHER_COLS = ("temperature", "rainfall", "humidity")
+# Opt-in (PRELOAD_SYNS=1): load every syndrome model at import, so a pre-forking
+# server (gunicorn --preload) shares one copy across workers. Otherwise the app
+# lifespan warms them, like the demand models.
+PRELOAD_SYNS = os.getenv("PRELOAD_SYNS", "0") == "1"
 
-def list_available_syndromes() -> List[str]:
+_PREDICT_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="syndromes")
+
+# Artifacts only change on deploy; rescan the folder at most once per TTL window.
+_SYN_CACHE_TTL = 30
+
+@lru_cache(maxsize=1)
+def _scan_syndromes(epoch: int) -> tuple:
     if not ART_ROOT.exists():
-        return []
-    return sorted([p.name for p in ART_ROOT.iterdir() if p.is_dir()])
+        return ()
+    return tuple(sorted(p.name for p in ART_ROOT.iterdir() if p.is_dir()))
 
-def _build_features_for_syn(hist_df: pd.DataFrame, syn_col: str, threshold: int = 1) -> pd.DataFrame:
-    d = pd.DataFrame(index=hist_df.index)
-    # numeric counts
-    y_count = pd.to_numeric(hist_df[syn_col], errors="coerce").fillna(0)
-    d["y_count"] = y_count
+def list_available_syndromes() -> List[str]:
+    return list(_scan_syndromes(int(time.time() // _SYN_CACHE_TTL)))
+
+def _as_f64(a: np.ndarray) -> np.ndarray:
+    # already-numeric columns skip the to_numeric scan/copy
+    if a.dtype.kind in "fiu":
+        return a.astype(np.float64, copy=False)
+    return np.asarray(pd.to_numeric(a, errors="coerce"), dtype=np.float64)
 
-    # lags/rollings
+def _shift(a: np.ndarray, lag: int) -> np.ndarray:
+    out = np.empty(a.size, dtype=np.float64)
+    out[:lag] = np.nan
+    out[lag:] = a[:-lag]
+    return out
+
+def _lag_roll_block(y: np.ndarray, tp) -> Dict[str, np.ndarray]:
+    # pandas rolling over the whole series on purpose, see tests/test_ml.py
+    out = {}
     for lag in [1,7,14,28]:
-        d[f"lag_{lag}"] = d["y_count"].shift(lag)
+        out[f"lag_{lag}"] = _shift(y, lag)
+    ys = pd.Series(y)
     for w in [7,14,28]:
-        d[f"roll_mean_{w}"] = d["y_count"].rolling(w).mean()
-        d[f"roll_std_{w}"]  = d["y_count"].rolling(w).std()
+        r = ys.rolling(w)
+        out[f"roll_mean_{w}"] = r.mean().to_numpy()
+        out[f"roll_std_{w}"]  = r.std().to_numpy()
+    if tp is not None:
+        out["tp_lag_1"]  = _shift(tp, 1)
+        out["tp_lag_7"]  = _shift(tp, 7)
+        out["tp_mean_7"] = pd.Series(tp).rolling(7).mean().to_numpy()
+    return out
+
+def _build_features_for_syn(hist_df: pd.DataFrame, syn_col: str, threshold: int = 1, inference: bool = True) -> pd.DataFrame:
+    # Full history on purpose, see tests/test_ml.py.
+    # inference=True returns only the final row (empty if it lacks full lag/rolling
+    # context); inference=False returns every complete row, as used for training.
+    # pull every input column once; the rest of the build works on plain arrays
+    cols = {c: hist_df[c].to_numpy() for c in (syn_col, "date", "total_patients", *WEATHER_COLS) if c in hist_df.columns}
+
+    # numeric counts
+    y = _as_f64(cols[syn_col])
+    if np.isnan(y).any():
+        y = np.where(np.isnan(y), 0.0, y)
+    tp = _as_f64(cols["total_patients"]) if "total_patients" in cols else None
+
+    # lags/rollings (+ total_patients context)
+    block = _lag_roll_block(y, tp)
+    out = {"y_count": y}
+    out.update((k, v) for k, v in block.items() if not k.startswith("tp_"))
 
     # context
-    d["date"] = hist_df["date"].values
-    d["dow"] = d["date"].dt.dayofweek
-    d["month"] = d["date"].dt.month
-    d["is_weekend"] = (d["dow"] >= 5).astype(int)
+    # calendar parts by integer math on epoch days/months (1970-01-01 was a Thursday, dayofweek 3)
+    days = np.asarray(cols["date"], dtype="datetime64[D]")
+    dow = ((days.view(np.int64) + 3) % 7).astype(np.int8)
+    out["dow"] = dow
+    out["month"] = (days.astype("datetime64[M]").view(np.int64) % 12 + 1).astype(np.int8)
+    out["is_weekend"] = (dow >= 5).astype(np.int8)
+    out.update((k, v) for k, v in block.items() if k.startswith("tp_"))
 
-    if "total_patients" in hist_df.columns:
-        tp = pd.to_numeric(hist_df["total_patients"], errors="coerce")
-        d["tp_lag_1"]  = tp.shift(1)
-        d["tp_lag_7"]  = tp.shift(7)
-        d["tp_mean_7"] = tp.rolling(7).mean()
+    for col in WEATHER_COLS:
+        if col in cols:
+            out[col] = _as_f64(cols[col])
 
-    for col in ["temperature","rainfall","humidity"]:
-        if col in hist_df.columns:
-            d[col] = pd.to_numeric(hist_df[col], errors="coerce")
+    need = [v for k, v in out.items() if k.startswith("lag_") or k.startswith("roll_")]
+    if inference:
+        if not y.size or any(np.isnan(v[-1]) for v in need):
+            return pd.DataFrame(columns=list(out))
+        return pd.DataFrame(
+            {k: np.nan_to_num(v[-1:], nan=0.0, posinf=0.0, neginf=0.0) for k, v in out.items()},
+            index=hist_df.index[-1:],
+        )
 
-    need = [c for c in d.columns if c.startswith("lag_") or c.startswith("roll_")]
-    d = d.dropna(subset=need)
+    # drop warm-up rows where any lag/rolling is still undefined
+    keep = ~np.isnan(np.column_stack(need)).any(axis=1)
 
-    X = d.drop(columns=["date"], errors="ignore").replace([np.inf,-np.inf], np.nan).fillna(0)
-    return X
+    X = pd.DataFrame({k: v[keep] for k, v in out.items()}, index=hist_df.index[keep])
+    return X.replace([np.inf,-np.inf], np.nan).fillna(0)
 
+@lru_cache(maxsize=None)
 def _load_syn_artifacts(syn_code: str):
+    """
+    Load ml/artifacts/syndromes/<syn_code>/{model.pkl, features.json, meta.json}.
+    Cached per process; the returned model is shared and must be treated read-only.
+    """
     base = ART_ROOT / syn_code
-    model = joblib.load(base / "model.pkl")
-    feats = json.load(open(base / "features.json"))
-    meta  = json.load(open(base / "meta.json"))
-    feat_list = feats.get("features", [])
+    # mmap_mode keeps any NumPy arrays in the pickle backed by the page cache
+    model = joblib.load(base / "model.pkl", mmap_mode="r")
+    feats = orjson.loads((base / "features.json").read_bytes())
+    meta  = orjson.loads((base / "meta.json").read_bytes())
+    feat_list = tuple(feats.get("features", []))  # training column order, shared read-only
     threshold = float(meta.get("threshold", 0.5))
     return model, feat_list, threshold
 
+def _positive_prob(model, x: np.ndarray) -> float:
+    # Binary LightGBM: the booster already returns P(y=1); skips the sklearn wrapper's
+    # input validation and the [1-p, p] column stacking of predict_proba.
+    if getattr(model, "objective_", None) == "binary":
+        return float(model.booster_.predict(x)[0])
+    return float(model.predict_proba(x)[0, 1])
+
+def warm_syn_artifacts() -> List[str]:
+    """
+    Load every available syndrome's artifacts and run one dummy prediction
+    per model. Returns the syndrome codes that were warmed.
+    """
+    warmed = []
+    for code in list_available_syndromes():
+        try:
+            model, _, _ = _load_syn_artifacts(code)
+            _positive_prob(model, np.zeros((1, model.n_features_in_)))
+        except Exception as e:
+            print(f"Syndrome warm-up skipped for '{code}': {e}")
+            continue
+        warmed.append(code)
+    return warmed
+
 def predict_one_syn(hist_df: pd.DataFrame, syn_code: str) -> Dict:
     """
     Returns: {"syndrome": syn_code, "prob": float}
@@ -66,14 +150,31 @@ def predict_one_syn(hist_df: pd.DataFrame, syn_code: str) -> Dict:
     model, feat_list, thr = _load_syn_artifacts(syn_code)
 
     X_all = _build_features_for_syn(hist_df, csv_col)
-    # align to training feature order
-    for col in feat_list:
-        if col not in X_all.columns:
-            X_all[col] = 0
-    X_all = X_all[feat_list]
     if X_all.empty:
         raise ValueError(f"Not enough history to predict '{syn_code}'.")
 
-    x = X_all.iloc[[-1]]
-    prob = float(model.predict_proba(x)[:,1][0])
+    # last row in training feature order as a (1, F) float64 array; missing features are 0
+    last = dict(zip(X_all.columns, X_all.iloc[-1].to_numpy(dtype=np.float64)))
+    x = np.array([[last.get(c, 0.0) for c in feat_list]])
+    prob = _positive_prob(model, x)
     return {"syndrome": syn_code, "prob": prob}
+
+def predict_all(hist_df: pd.DataFrame, syn_codes: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Predict several syndromes (default: all available) on the shared thread pool;
+    feature builds and model calls of different syndromes overlap.
+    Syndromes that cannot be predicted (missing column/artifacts, short history,
+    model errors) are skipped. Returns [{syndrome, prob}, ...] in input order.
+    """
+    codes = list_available_syndromes() if syn_codes is None else syn_codes
+
+    def _predict(code: str) -> Optional[Dict]:
+        try:
+            return predict_one_syn(hist_df, code)
+        except Exception:
+            return None
+
+    return [r for r in _PREDICT_POOL.map(_predict, codes) if r is not None]
+
+if PRELOAD_SYNS:
+    warm_syn_artifacts()
@@ -0,0 +1,20 @@
+# tests/conftest.py
+import contextlib, io, os
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+@pytest.fixture(scope="module")
+def api():
+    if not (ROOT / "data/raw/data10yrs.csv").exists() or not (ROOT / "ml/artifacts").exists():
+        pytest.skip("history CSV / model artifacts not available")
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # artifact and data paths are relative to the repo root
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import api.main as main
+        yield main
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,31 @@
+# tests/test_api.py
+import itertools
+
+def _old_stock_severity(on_hand, reorder_point):
+    """The if/elif chain compute_critical_alerts used before _stock_severity."""
+    if on_hand < reorder_point * 0.25:
+        return "HIGH"
+    elif on_hand < reorder_point * 0.5:
+        return "MEDIUM"
+    elif on_hand <= reorder_point:
+        return "LOW"
+    return None
+
+def test_stock_severity_matches_old_chain(api):
+    # integer grid (inventory counts are ints) including reorder_point <= 0
+    grid = itertools.product(range(-10, 251), range(-40, 201))
+    for on_hand, rp in grid:
+        assert api._stock_severity(on_hand, rp) == _old_stock_severity(on_hand, rp), (on_hand, rp)
+
+def test_stock_severity_boundaries(api):
+    for rp in (4, 40, 60, 150, 1000):
+        for on_hand in (0, rp * 0.25, rp * 0.5, rp, rp + 1):
+            assert api._stock_severity(on_hand, rp) == _old_stock_severity(on_hand, rp), (on_hand, rp)
+    assert api._stock_severity(10, 40) == "MEDIUM"   # r == 0.25
+    assert api._stock_severity(20, 40) == "LOW"      # r == 0.5
+    assert api._stock_severity(40, 40) == "LOW"      # r == 1
+    assert api._stock_severity(41, 40) is None
+    assert api._stock_severity(0, 0) == "LOW"
+    assert api._stock_severity(-1, 0) == "HIGH"
+    assert api._stock_severity(-5, -10) == "HIGH"
+    assert api._stock_severity(0, -10) is None
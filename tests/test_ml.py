@@ -0,0 +1,57 @@
+# tests/test_ml.py
+"""
+Inference parity: the feature row the API predicts on for a date must be the
+row a full-history build (as in training) produces for that date.
+
+This is why the feature builders always run pandas over the full history and
+never over a tail window or a hand-written kernel: rolling().std() is a running
+computation whose last bits depend on where the series starts, and LightGBM
+splits sit exactly on the training values, so a 1e-14 difference can move a
+prediction. "Close" is not enough; predictions are compared for exact equality
+over many trailing dates.
+"""
+import numpy as np
+
+N_DATES = 120
+
+def _trailing_ends(hist):
+    return range(len(hist) - N_DATES, len(hist))
+
+def test_volume_matches_full_history_build(api):
+    hist = api._hist_with_weather()
+    feats = api.build_volume_features(hist).dropna(subset=api.LAG_ROLL_COLS)
+    X_full = api.prep_X_from_features(feats, api.vol_feat_list)
+    for end in _trailing_ends(hist):
+        expected = api.vol_model.predict(X_full.loc[[end]])[0]
+        got = api.vol_model.predict(api._volume_row(hist.iloc[:end + 1]))[0]
+        assert got == expected, f"volume differs for {hist['date'].iloc[end]}"
+
+def test_demand_matches_full_history_build(api):
+    from api.services import demand
+    hist = api._hist_with_weather()
+    items = demand.list_available_items()
+    assert items
+    full = {}
+    for code in items:
+        model, feat_list, _ = demand._load_item_artifacts(code)
+        X = demand._build_features_for_item(hist, f"{code}_used").reindex(columns=feat_list, fill_value=0)
+        full[code] = (model, X)
+    for end in _trailing_ends(hist):
+        preds = {p["item_code"]: p["yhat"] for p in demand.predict_items(hist.iloc[:end + 1], items)}
+        for code, (model, X) in full.items():
+            expected = float(model.predict(X.loc[[end]].to_numpy(dtype=np.float64))[0])
+            assert preds[code] == expected, f"{code} differs for {hist['date'].iloc[end]}"
+
+def test_syndromes_match_full_history_build(api):
+    from api.services import syndromes
+    hist = api._hist_with_weather()
+    codes = syndromes.list_available_syndromes()
+    assert codes
+    for code in codes:
+        model, feat_list, _ = syndromes._load_syn_artifacts(code)
+        X = syndromes._build_features_for_syn(hist, f"{code}_cases", inference=False)
+        X = X.reindex(columns=list(feat_list), fill_value=0)
+        for end in _trailing_ends(hist):
+            expected = syndromes._positive_prob(model, X.loc[[end]].to_numpy(dtype=np.float64))
+            got = syndromes.predict_one_syn(hist.iloc[:end + 1], code)["prob"]
+            assert got == expected, f"{code} differs for {hist['date'].iloc[end]}"